@@ -0,0 +1,36 @@
+"""
+cache.py
+Small file-backed cache for LLM responses. Each entry is stored as
+`.qa_cache/<key>.json`, where the key is a sha256 hex digest computed by
+the caller. Enabled by setting `QA_CACHE=1`.
+"""
+
+import os
+from pathlib import Path
+from typing import Optional
+
+import orjson
+
+CACHE_DIR = Path(__file__).with_name(".qa_cache")
+
+
+def enabled() -> bool:
+    """Return True if response caching is switched on via QA_CACHE."""
+    return os.getenv("QA_CACHE") == "1"
+
+
+def get(key: str) -> Optional[str]:
+    """Return the cached value for `key`, or None on a miss."""
+    try:
+        return orjson.loads((CACHE_DIR / f"{key}.json").read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+
+def set(key: str, val: str) -> None:
+    """Store `val` under `key`, replacing any previous entry."""
+    CACHE_DIR.mkdir(exist_ok=True)
+    path = CACHE_DIR / f"{key}.json"
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(orjson.dumps(val))
+    os.replace(tmp_path, path)
@@ -1,41 +1,185 @@
 """
 prompts.py
 Prompt templates for QA analysis of customer support transcripts.
+
+Every standalone template starts with the same static `_PREAMBLE` (role
+and full classification rubric), followed by the step-specific
+instructions, and only then the per-call input after `INPUT_MARKER`.
+Keeping the variable part at the very end lets OpenAI's automatic prompt
+caching reuse the shared prefix across transcripts.
+
+The stepwise pipeline is a conversation: `SUMMARY_PROMPT` opens it and
+`CLASSIFICATION_PROMPT` / `IMPROVEMENT_PROMPT` are each sent as a follow-up
+turn to the summary, so both requests extend the first one and hit the
+cached prefix. The two follow-ups are independent and run concurrently.
+"""
+
+INPUT_MARKER = "\n\n---\nINPUT:\n"
+
+# Shared static prefix – role, rubric and examples
+_PREAMBLE = """You are a QA assistant reviewing calls between customers of an e-commerce
+retailer and an AI voice support agent. Calls are analysed in three steps:
+summarisation, outcome classification and improvement suggestions.
+
+Every call outcome falls into exactly ONE of the following categories:
+
+- Automated – Successful
+  The AI agent handled the call entirely on its own and the customer's issue
+  was resolved. Example: the agent looks up an order, gives the delivery
+  date, and the customer thanks the agent and ends the call satisfied.
+
+- Automated – Partially Successful
+  The AI agent handled the call without a human, but concerns remain open.
+  Example: the agent provides tracking information, but the customer reports
+  the package went to the wrong address and is only told to wait and call
+  back later.
+
+- Escalated – Partially Successful
+  The AI agent made real progress before the call was handed to a human.
+  Example: the agent verifies the order and starts a return, then transfers
+  the customer because the refund is overdue and needs manual review.
+
+- Escalated – Unsuccessful
+  The call was escalated immediately or the AI agent failed to help before
+  escalating. Example: the customer asks for a human straight away, or the
+  agent cannot understand the request and transfers the call.
+
+When reviewing a call, pay attention to:
+- The customer's intent (order status, return / refund, membership,
+  product question, or general inquiry)
+- What the AI agent did: information given, actions taken, links sent
+- Whether the issue was resolved, left open, or escalated to a human
+- Signs of customer frustration and how the agent responded to them
+
+Rules for borderline calls:
+- A call counts as escalated whenever the agent transfers, connects, or
+  promises a callback from a human, even if the customer asked for it.
+- A polite "thank you" at the end does not by itself mean the issue was
+  resolved; judge by whether the customer's actual request was met.
+- If the agent gave correct information but the customer still has to take
+  further action to fix the problem, the call is at most partially
+  successful.
+- If the agent did nothing useful before an escalation, choose
+  Escalated – Unsuccessful even when the human later solves the issue.
+- Improvements must be specific to what happened in this call; avoid
+  generic advice such as "be more helpful".
+
+Worked examples of reviewed calls:
+
+Example 1
+Summary: The customer asked where their running shoes were. The agent
+verified the account, found the order, and said it was out for delivery
+with FedEx and would arrive the next afternoon. The customer had no
+further questions and thanked the agent.
+Classification: Automated – Successful
+Improvements:
+- Offer to text or email the tracking link so the customer can follow
+  the delivery without calling back.
+- Confirm the delivery address on file while the order is open.
+
+Example 2
+Summary: The customer wanted to know why a promo code failed at checkout.
+The agent explained the code had expired and listed current offers, but
+could not apply a discount to the already-placed order. The customer
+ended the call still unhappy about the price.
+Classification: Automated – Partially Successful
+Improvements:
+- Check whether a price adjustment policy applies before declining.
+- Acknowledge the customer's disappointment and summarise next options
+  before ending the call.
+
+Example 3
+Summary: The customer called about a refund that had not arrived two weeks
+after a return. The agent confirmed the return was received, explained the
+usual refund timeline, and sent a returns portal link. When the customer
+asked for a person, the agent transferred the call to a specialist.
+Classification: Escalated – Partially Successful
+Improvements:
+- Flag refunds past the standard processing window and escalate
+  proactively instead of waiting for the customer to ask.
+- Tell the customer what the specialist will do and roughly how long
+  the hold will be.
+
+Example 4
+Summary: The customer said "representative" twice as soon as the call
+started. The agent asked two clarifying questions the customer ignored,
+then connected them to a human without collecting any details.
+Classification: Escalated – Unsuccessful
+Improvements:
+- Collect the order number or reason for calling before transferring so
+  the human agent does not have to start from scratch.
+- Offer the transfer immediately when a customer repeats the request
+  instead of asking more questions.
 """
 
 # Prompt 1 – Summarize
-SUMMARY_PROMPT = """You are a QA assistant. Summarize the following customer support call.
+SUMMARY_PROMPT = _PREAMBLE + """
+TASK: Summarize the customer support call transcript given as input.
 Focus on:
 - The customer’s intent
 - The AI agent’s actions
 - Whether the issue was resolved or escalated
-
-Transcript:
+Keep the summary under 150 words.
+""" + INPUT_MARKER + """Transcript:
 {transcript}
 """
 
-# Prompt 2 – Classification
-CLASSIFICATION_PROMPT = """Based on this summary, classify the call outcome into ONE of the following:
-- Automated – Successful
-- Automated – Partially Successful
-- Escalated – Partially Successful
-- Escalated – Unsuccessful
-
-Summary:
-{summary}
+# Prompt 2 – Classification (follow-up turn after the summary)
+CLASSIFICATION_PROMPT = """Based on your summary above, classify the call outcome into ONE of the
+categories defined at the start.
 
 Answer with ONLY the classification text.
 """
 
-# Prompt 3 – Improvement suggestions
-IMPROVEMENT_PROMPT = """You are a QA reviewer. Based on the call summary and classification, suggest
-2–3 concrete improvements for the AI agent’s behavior.
+# Prompt 3 – Improvement suggestions (follow-up turn after the summary)
+IMPROVEMENT_PROMPT = """You are now the QA reviewer. Based on your summary above, suggest 2–3
+concrete improvements for the AI agent’s behavior.
 
-Summary:
-{summary}
+Write clear bullet points.
+"""
 
-Classification:
-{classification}
+# Fused prompt – summary, classification and improvements in one JSON call
+FUSED_PROMPT = _PREAMBLE + """
+TASK: Review the customer support call transcript given as input and carry
+out all three steps at once:
+1. Summarize the call. Focus on the customer’s intent, the AI agent’s
+   actions, and whether the issue was resolved or escalated.
+2. Classify the call outcome into ONE of the categories above, using the
+   exact category text.
+3. As a QA reviewer, suggest 2–3 concrete improvements for the AI agent’s
+   behavior.
 
-Write clear bullet points.
+Respond with a JSON object with exactly these keys:
+{{"summary": "<summary text>",
+  "classification": "<category text>",
+  "improvements": ["<improvement 1>", "<improvement 2>", ...]}}
+""" + INPUT_MARKER + """Transcript:
+{transcript}
+"""
+
+# Batch prompt – fused analysis for several transcripts in one JSON call
+BATCH_PROMPT = _PREAMBLE + """
+TASK: The input contains several customer support call transcripts, each
+introduced by a numbered "### Item" header. Review every call independently and
+carry out all three steps for each one:
+1. Summarize the call. Focus on the customer’s intent, the AI agent’s
+   actions, and whether the issue was resolved or escalated.
+2. Classify the call outcome into ONE of the categories above, using the
+   exact category text.
+3. As a QA reviewer, suggest 2–3 concrete improvements for the AI agent’s
+   behavior.
+
+Respond with a JSON object holding one result per call, in input order:
+{{"results": [
+  {{"item": <item number from the header>,
+    "summary": "<summary text>",
+    "classification": "<category text>",
+    "improvements": ["<improvement 1>", "<improvement 2>", ...]}},
+  ...
+]}}
+""" + INPUT_MARKER + """{transcripts}"""
+
+# One transcript section inside BATCH_PROMPT
+BATCH_ITEM = """### Item {index}
+{transcript}
 """
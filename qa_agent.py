@@ -4,36 +4,68 @@ This module implements the core logic for analysing e-commerce customer
 support calls using large language models (LLMs). Prompts live in
 `prompts.py` and are passed to a chosen LLM. If no OpenAI API key is
 available, a heuristic fallback runs instead.
+
+All LLM calls are asynchronous so that several transcripts can be analysed
+concurrently; `analyze_transcript` is a blocking wrapper for single calls.
 """
 
 import os
-from dataclasses import dataclass, asdict
-from typing import Optional, Dict
-from openai import OpenAI, OpenAIError
+import asyncio
+import random
+import hashlib
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple, Union
+import orjson
+import tiktoken
+from openai import (
+    AsyncOpenAI,
+    OpenAIError,
+    APIConnectionError,
+    APIStatusError,
+    RateLimitError,
+    DEFAULT_CONNECTION_LIMITS,
+    DefaultAsyncHttpxClient,
+)
 
+import cache
 import prompts
+import semantic_cache
 
 # Load environment variables from .env file if it exists
 def _load_env():
     """Load environment variables from .env file if present."""
-    env_path = os.path.join(os.path.dirname(__file__), '.env')
-    if os.path.exists(env_path):
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key] = value
+    env_path = Path(__file__).with_name('.env')
+    if env_path.is_file():
+        lines = (line.strip() for line in env_path.read_text().splitlines())
+        os.environ.update(dict(
+            line.split('=', 1) for line in lines
+            if line and not line.startswith('#') and '=' in line
+        ))
 
 _load_env()
 
 
-@dataclass
+@dataclass(frozen=True)
 class CallAnalysis:
+    __slots__ = ("call_id", "summary", "classification", "improvements")
+
     call_id: Optional[str]
     summary: str
     classification: str
-    improvements: str
+    improvements: Union[str, List[str]]
+
+    def to_dict(self) -> Dict:
+        """Shallow dict of the fields (cheaper than `asdict`, which deep-copies)."""
+        return {
+            "call_id": self.call_id,
+            "summary": self.summary,
+            "classification": self.classification,
+            "improvements": self.improvements,
+        }
 
 
 # ---------------------------------------------------------------------
@@ -41,33 +73,290 @@ class CallAnalysis:
 # ---------------------------------------------------------------------
 
 def _get_client():
-    """Return OpenAI client if API key is present, else None."""
+    """Return async OpenAI client if API key is present, else None."""
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         return None
     try:
-        return OpenAI(api_key=api_key)
+        # Retries are handled by `_with_retries` so they are not compounded
+        return AsyncOpenAI(api_key=api_key, max_retries=0, http_client=_http_client())
     except OpenAIError:
         return None
 
 
-client = _get_client()
+def _http_client():
+    """
+    Return a pooled HTTP/2 client for the SDK, so the concurrent fan-out
+    multiplexes over a few kept-alive sockets. Returns None (the SDK's own
+    HTTP/1.1 client) if the optional `h2` package is not installed.
+    """
+    # Build the limits with the SDK's own HTTP library (httpx or httpx2)
+    limits = type(DEFAULT_CONNECTION_LIMITS)(max_connections=64, max_keepalive_connections=32)
+    try:
+        return DefaultAsyncHttpxClient(http2=True, limits=limits, timeout=60.0)
+    except ImportError:
+        return None
+
+
+# Client of the current analysis session, set by `_analysis_session`
+_session_client: ContextVar = ContextVar("_session_client")
+
+
+@asynccontextmanager
+async def _analysis_session():
+    """
+    Provide one client for everything awaited inside the block and close it
+    on exit. The public entry points each open a session, so a client never
+    outlives the event loop its pooled connections belong to; nested
+    sessions (and tasks they spawn) reuse the outer client. Semantic cache
+    entries added during the session are saved when it ends.
+    """
+    if _session_client.get(None) is not None:
+        yield
+        return
+    client = _get_client()
+    # False marks "session open, no API key" so nested sessions still reuse it
+    token = _session_client.set(client or False)
+    try:
+        yield
+    finally:
+        _session_client.reset(token)
+        _save_semantic_caches()
+        if client is not None:
+            await client.close()
+
+
+def _client():
+    """
+    Return the current session's client, or None if no API key is set.
+    The client is only created when a session starts, so importing this
+    module does no SDK work.
+    """
+    return _session_client.get(None) or None
+
+
+def _require_client():
+    """Return the current session's client, raising if no API key is set."""
+    client = _client()
+    if client is None:
+        raise RuntimeError("WARNING: No valid API key detected. Falling back to heuristics.")
+    return client
 
 
 # ---------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------
 
-def _call_openai(prompt: str, model: str = "gpt-4o-mini") -> str:
-    """Call OpenAI API with the given prompt text."""
-    if client is None:
-        raise RuntimeError("WARNING: No valid API key detected. Falling back to heuristics.")
-    resp = client.chat.completions.create(
+_MAX_ATTEMPTS = 5
+
+
+def _is_transient(error: Exception) -> bool:
+    """
+    True for rate limits, server errors and connection failures. A 429 for
+    an exhausted quota (`insufficient_quota`) will never succeed on retry.
+    """
+    if isinstance(error, RateLimitError):
+        return getattr(error, "code", None) != "insufficient_quota"
+    if isinstance(error, APIConnectionError):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+async def _with_retries(request):
+    """
+    Await `request()` and retry transient API errors with jittered
+    exponential backoff, so one failed step does not throw away the results
+    of earlier ones. The last error is re-raised once attempts run out.
+    """
+    for attempt in range(_MAX_ATTEMPTS):
+        try:
+            return await request()
+        except (RateLimitError, APIStatusError, APIConnectionError) as e:
+            if not _is_transient(e) or attempt == _MAX_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(min(2 ** attempt, 30) + random.random())
+
+
+async def _call_openai(
+    prompt: str,
+    model: str = "gpt-4o-mini",
+    temperature: float = 0,
+    response_format: Optional[Dict] = None,
+    max_tokens: Optional[int] = None,
+    stop: Optional[List[str]] = None,
+    history: Optional[List[Dict]] = None,
+) -> str:
+    """
+    Call OpenAI API with the given prompt text. With QA_CACHE=1, deterministic
+    (temperature 0) responses are served from and saved to the on-disk cache.
+    Pass `response_format={"type": "json_object"}` to request JSON output, and
+    `max_tokens` / `stop` to bound the length of the completion. `history`
+    holds earlier conversation messages to send before the prompt.
+    """
+    messages = [*(history or []), {"role": "user", "content": prompt}]
+    extra = {
+        name: value
+        for name, value in (
+            ("response_format", response_format), ("max_tokens", max_tokens), ("stop", stop)
+        )
+        if value is not None
+    }
+
+    use_cache = cache.enabled() and temperature == 0
+    if use_cache:
+        key_bytes = f"{model}\0{prompt}".encode()
+        if extra:
+            key_bytes += b"\0" + orjson.dumps(extra, option=orjson.OPT_SORT_KEYS)
+        if history:
+            key_bytes += b"\0" + orjson.dumps(history)
+        key = hashlib.sha256(key_bytes).hexdigest()
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    client = _require_client()
+    resp = await _with_retries(lambda: client.chat.completions.create(
         model=model,
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0,
+        messages=messages,
+        temperature=temperature,
+        **extra,
+    ))
+    content = resp.choices[0].message.content.strip()
+
+    if use_cache:
+        cache.set(key, content)
+    return content
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    """
+    Return the tiktoken encoding for `model`, defaulting for unknown models.
+    Returns None if the encoding cannot be loaded (tiktoken downloads it on
+    first use), so offline runs still work with an approximate count.
+    """
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        print(f"WARNING: Could not load tokenizer, estimating token counts: {e}")
+        return None
+
+
+def _count_tokens(text: str, model: str) -> int:
+    """Return the number of tokens in `text`, or ~4 chars per token offline."""
+    enc = _encoding(model)
+    return len(text) // 4 if enc is None else len(enc.encode(text))
+
+
+# Context window sizes in tokens, matched on the longest model-name prefix
+# so dated snapshots ("gpt-4o-mini-2024-07-18") resolve too. Unknown models
+# get the smallest common window.
+_CONTEXT_WINDOWS = {
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+}
+_DEFAULT_CONTEXT_WINDOW = 8192
+
+# Tokens kept free for the model's reply
+_COMPLETION_RESERVE = 1024
+
+
+@lru_cache(maxsize=None)
+def _transcript_budget(model: str) -> int:
+    """
+    Return the longest transcript, in tokens, that fits in `model`'s context
+    window next to the largest prompt template and the completion reserve.
+    """
+    prefixes = [name for name in _CONTEXT_WINDOWS if model.startswith(name)]
+    window = _CONTEXT_WINDOWS[max(prefixes, key=len)] if prefixes else _DEFAULT_CONTEXT_WINDOW
+    template_tokens = max(
+        _count_tokens(template, model)
+        for template in (prompts.SUMMARY_PROMPT, prompts.FUSED_PROMPT, prompts.BATCH_PROMPT)
     )
-    return resp.choices[0].message.content.strip()
+    return window - template_tokens - _COMPLETION_RESERVE
+
+
+_TRUNCATION_MARKER = "\n...[truncated]...\n"
+
+
+def _truncate_transcript(
+    transcript: str, model: str, budget: Optional[int] = None
+) -> Tuple[str, int]:
+    """
+    Cut the middle out of `transcript` so it fits in `budget` tokens, by
+    default all the room `model`'s context window leaves for it. The
+    opening and closing (where intent and outcome live) are kept. Returns
+    the text to send and its token count, so callers never have to tokenise
+    the transcript a second time.
+    """
+    if budget is None:
+        budget = _transcript_budget(model)
+    enc = _encoding(model)
+    if enc is None:
+        # No tokenizer available: apply the same rule to ~4 chars per token
+        if len(transcript) <= budget * 4:
+            return transcript, len(transcript) // 4
+        half = budget * 2
+        return transcript[:half] + _TRUNCATION_MARKER + transcript[-half:], budget
+
+    toks = enc.encode(transcript)
+    if len(toks) <= budget:
+        return transcript, len(toks)
+    half = budget // 2
+    toks = toks[:half] + enc.encode(_TRUNCATION_MARKER) + toks[-half:]
+    return enc.decode(toks), len(toks)
+
+
+def _pack_batches(items: List, token_counts: List[int], token_budget: int) -> List[List]:
+    """
+    Greedily group `items`, in order, so each group's `token_counts` stay
+    within `token_budget`. An item that is larger than the budget on its
+    own gets a group to itself.
+    """
+    batches, current, used = [], [], 0
+    for item, n_tokens in zip(items, token_counts):
+        if current and used + n_tokens > token_budget:
+            batches.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += n_tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+# Intent table for the heuristic fallback, checked in priority order. A
+# keyword matches where a word starts with it, so all inflections count
+# ("ordering", "sized") but a keyword inside a word does not ("reorder").
+_INTENT_TABLE = [
+    (("order",), "Order status"),
+    (("return", "refund"), "Return / Refund"),
+    (("membership",), "Membership"),
+    (("siz",), "Product question"),
+]
+
+
+def _starts_word(text: str, keyword: str) -> bool:
+    """Return True if some word in `text` starts with `keyword`."""
+    i = text.find(keyword)
+    while i != -1:
+        if i == 0 or not text[i - 1].isalpha():
+            return True
+        i = text.find(keyword, i + 1)
+    return False
+
+
+# Escalation / success keywords. Each is a separate `in` check: CPython's
+# substring search runs in C and beats a single `re` pass over the same
+# keywords, which has to try every alternative at every position.
+_ESCALATION_KEYWORDS = ("transfer", "connect", "escalate")
+_SUCCESS_KEYWORDS = ("thank you", "great", "resolved")
 
 
 def _heuristic_analysis(transcript: str, call_id: Optional[str] = None) -> Dict:
@@ -75,20 +364,15 @@ def _heuristic_analysis(transcript: str, call_id: Optional[str] = None) -> Dict:
     text = transcript.lower()
 
     # detect intent
-    if "order" in text:
-        intent = "Order status"
-    elif "return" in text or "refund" in text:
-        intent = "Return / Refund"
-    elif "membership" in text:
-        intent = "Membership"
-    elif "size" in text:
-        intent = "Product question"
-    else:
-        intent = "General inquiry"
+    intent = next(
+        (label for keywords, label in _INTENT_TABLE
+         if any(_starts_word(text, keyword) for keyword in keywords)),
+        "General inquiry",
+    )
 
     # detect escalation / success
-    escalated = any(word in text for word in ["transfer", "connect", "escalate"])
-    successful = ("thank you" in text or "great" in text or "resolved" in text) and not escalated
+    escalated = any(keyword in text for keyword in _ESCALATION_KEYWORDS)
+    successful = not escalated and any(keyword in text for keyword in _SUCCESS_KEYWORDS)
 
     if not escalated and successful:
         outcome = "Automated - Successful"
@@ -112,41 +396,398 @@ def _heuristic_analysis(transcript: str, call_id: Optional[str] = None) -> Dict:
     }
 
 
+# ---------------------------------------------------------------------
+# Semantic cache
+# ---------------------------------------------------------------------
+
+async def _embed(texts: List[str]) -> List[List[float]]:
+    """Return the embeddings of `texts`, in order, from a single request."""
+    client = _require_client()
+    resp = await _with_retries(
+        lambda: client.embeddings.create(model=semantic_cache.EMBEDDING_MODEL, input=texts)
+    )
+    return [item.embedding for item in sorted(resp.data, key=lambda item: item.index)]
+
+
+# Prompt templates behind each pipeline's results. The semantic caches are
+# keyed on them so results never outlive a prompt edit or cross pipelines.
+_PIPELINE_TEMPLATES = {
+    "fused": (prompts.FUSED_PROMPT,),
+    "stepwise": (prompts.SUMMARY_PROMPT, prompts.CLASSIFICATION_PROMPT, prompts.IMPROVEMENT_PROMPT),
+    "batch": (prompts.BATCH_PROMPT, prompts.BATCH_ITEM),
+}
+
+# One semantic cache per file (model, pipeline and prompt version), loaded
+# from disk on first use. A row whose analysis is still running holds an
+# asyncio.Future, so later near-duplicates wait for that result instead of
+# starting their own.
+_semantic_caches: Dict[Path, semantic_cache.SemanticCache] = {}
+
+
+def _semantic_cache_for(model: str, pipeline: str) -> semantic_cache.SemanticCache:
+    path = semantic_cache.path_for(model, pipeline, _PIPELINE_TEMPLATES[pipeline])
+    sem_cache = _semantic_caches.get(path)
+    if sem_cache is None:
+        sem_cache = semantic_cache.SemanticCache.load(path)
+        _semantic_caches[path] = sem_cache
+    return sem_cache
+
+
+def _save_semantic_caches() -> None:
+    """Write every semantic cache that gained entries to disk."""
+    for path, sem_cache in _semantic_caches.items():
+        if sem_cache.dirty:
+            try:
+                sem_cache.save(path)
+            except OSError as e:
+                print(f"WARNING: Could not save semantic cache: {e}")
+
+
+def _copy_result(result: Dict, call_id: Optional[str]) -> Dict:
+    """Copy of an analysis for `call_id` that shares no lists with `result`."""
+    copy = dict(result, call_id=call_id)
+    if isinstance(copy["improvements"], list):
+        copy["improvements"] = list(copy["improvements"])
+    return copy
+
+
+def _peek(sem_cache: semantic_cache.SemanticCache, embedding: List[float]):
+    """
+    Return the finished analysis (dict) or in-flight Future for a
+    near-duplicate of `embedding`, or None. Futures left behind by an
+    earlier, interrupted event loop count as misses.
+    """
+    entry = sem_cache.lookup(embedding)
+    if isinstance(entry, asyncio.Future) and entry.get_loop() is not asyncio.get_running_loop():
+        return None
+    return entry
+
+
+async def _semantic_lookup(
+    sem_cache: semantic_cache.SemanticCache, embedding: List[float]
+) -> Optional[Dict]:
+    """Return the analysis of a near-duplicate, waiting for one in flight."""
+    entry = _peek(sem_cache, embedding)
+    while isinstance(entry, asyncio.Future):
+        await entry
+        entry = _peek(sem_cache, embedding)
+    return entry
+
+
+def _reserve(sem_cache: semantic_cache.SemanticCache, embedding: List[float]) -> int:
+    """Mark `embedding` as being analysed and return its row index."""
+    return sem_cache.add(embedding, asyncio.get_running_loop().create_future())
+
+
+def _settle(sem_cache: semantic_cache.SemanticCache, index: int, result: Optional[Dict]) -> None:
+    """
+    Finish the reservation at `index` with an LLM `result`, or drop it if
+    the analysis failed, and wake up anything waiting on it.
+    """
+    if result is None:
+        pending = sem_cache.discard(index)
+    else:
+        pending = sem_cache.update(index, _copy_result(result, None))
+    if not pending.done():
+        pending.set_result(None)
+
+
 # ---------------------------------------------------------------------
 # Main analysis
 # ---------------------------------------------------------------------
 
-def analyze_transcript(transcript: str, call_id: Optional[str] = None, model: str = None) -> Dict:
+async def _analyze_fused(transcript: str, model: str) -> Tuple[str, str, List[str]]:
+    """Run summary, classification and improvements as one JSON-mode call."""
+    resp = await _call_openai(
+        prompts.FUSED_PROMPT.format(transcript=transcript),
+        model=model,
+        response_format={"type": "json_object"},
+    )
+    data = orjson.loads(resp)
+    return data["summary"], data["classification"], data["improvements"]
+
+
+async def _analyze_stepwise(transcript: str, model: str) -> Tuple[str, str, str]:
+    """
+    Run the three steps as a conversation: summarise first, then classify and
+    suggest improvements concurrently as two follow-up turns to the summary.
+    Both follow-ups start with the same messages and so reuse OpenAI's
+    cached prompt prefix.
+    """
+    # Step 1: summarise
+    summary_prompt = prompts.SUMMARY_PROMPT.format(transcript=transcript)
+    summary = await _call_openai(summary_prompt, model=model, max_tokens=256)
+    history = [
+        {"role": "user", "content": summary_prompt},
+        {"role": "assistant", "content": summary},
+    ]
+
+    # Steps 2 and 3 only depend on the summary: classify (a single short
+    # label) and suggest improvements in parallel
+    tasks = [
+        asyncio.ensure_future(_call_openai(
+            prompts.CLASSIFICATION_PROMPT,
+            model=model,
+            max_tokens=12,
+            stop=["\n"],
+            history=history,
+        )),
+        asyncio.ensure_future(
+            _call_openai(prompts.IMPROVEMENT_PROMPT, model=model, max_tokens=200, history=history)
+        ),
+    ]
+    try:
+        classification, improvements = await asyncio.gather(*tasks)
+    except BaseException:
+        # Don't leave the other request retrying (and spending tokens) after
+        # this analysis has failed, or running past the session's client
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return summary, classification, improvements
+
+
+async def _analyze_llm(transcript: str, call_id: Optional[str], model: str, fused: bool) -> Dict:
+    """Analyse `transcript` with the LLM, raising on any failure."""
+    if fused:
+        summary, classification, improvements = await _analyze_fused(transcript, model)
+    else:
+        summary, classification, improvements = await _analyze_stepwise(transcript, model)
+
+    analysis = CallAnalysis(
+        call_id=call_id,
+        summary=summary,
+        classification=classification,
+        improvements=improvements,
+    )
+    return analysis.to_dict()
+
+
+async def analyze_transcript_async(
+    transcript: str, call_id: Optional[str] = None, model: str = None, fused: bool = True
+) -> Dict:
     """
     Analyse a transcript and return dict with summary, classification,
     and improvement suggestions. Uses LLM if available, else heuristics.
+    By default all three steps run as a single JSON call; pass
+    `fused=False` for the three-call pipeline. With QA_SEMANTIC_CACHE=1,
+    near-duplicates of earlier or in-flight transcripts, including those
+    from previous runs, reuse that analysis.
     """
     if model is None:
         model = "gpt-4o-mini"
 
+    async with _analysis_session():
+        return await _analyze_transcript(transcript, call_id, model, fused)
+
+
+async def _analyze_transcript(
+    transcript: str, call_id: Optional[str], model: str, fused: bool
+) -> Dict:
+    """Body of `analyze_transcript_async`, run inside an analysis session."""
     try:
-        # Step 1: summarise
-        summary = _call_openai(prompts.SUMMARY_PROMPT.format(transcript=transcript), model=model)
+        # Check the key first so heuristic-only runs never load a tokenizer
+        _require_client()
 
-        # Step 2: classify
-        classification = _call_openai(
-            prompts.CLASSIFICATION_PROMPT.format(summary=summary), model=model
-        )
+        # Truncate once so an over-long transcript cannot fail the LLM calls;
+        # the heuristic fallback below still sees the full text
+        llm_transcript, _ = _truncate_transcript(transcript, model)
 
-        # Step 3: suggest improvements
-        improvements = _call_openai(
-            prompts.IMPROVEMENT_PROMPT.format(summary=summary, classification=classification),
-            model=model,
-        )
+        if not semantic_cache.enabled():
+            return await _analyze_llm(llm_transcript, call_id, model, fused)
 
-        analysis = CallAnalysis(
-            call_id=call_id,
-            summary=summary,
-            classification=classification,
-            improvements=improvements,
-        )
-        return asdict(analysis)
+        sem_cache = _semantic_cache_for(model, "fused" if fused else "stepwise")
+        try:
+            embedding = (await _embed([llm_transcript]))[0]
+        except Exception as e:
+            print(f"WARNING: Semantic cache unavailable, analysing without it: {e}")
+            return await _analyze_llm(llm_transcript, call_id, model, fused)
+        cached = await _semantic_lookup(sem_cache, embedding)
+        if cached is not None:
+            return _copy_result(cached, call_id)
+
+        index = _reserve(sem_cache, embedding)
+        result = None
+        try:
+            result = await _analyze_llm(llm_transcript, call_id, model, fused)
+            return result
+        finally:
+            _settle(sem_cache, index, result)
 
     except Exception as e:
         print(f"WARNING: Falling back to heuristics due to error: {e}")
         return _heuristic_analysis(transcript, call_id=call_id)
+
+
+def analyze_transcript(
+    transcript: str, call_id: Optional[str] = None, model: str = None, fused: bool = True
+) -> Dict:
+    """Blocking wrapper around `analyze_transcript_async` for single calls."""
+    return asyncio.run(
+        analyze_transcript_async(transcript, call_id=call_id, model=model, fused=fused)
+    )
+
+
+async def _gather_with_sem(coros, sem: asyncio.Semaphore) -> List[Dict]:
+    """Await all coroutines concurrently, at most `sem` of them in flight."""
+    async def _bounded(coro):
+        async with sem:
+            return await coro
+
+    return await asyncio.gather(*(_bounded(c) for c in coros))
+
+
+async def analyze_transcripts(
+    transcripts: List[Tuple[Optional[str], str]],
+    model: str = None,
+    concurrency: int = 16,
+    fused: bool = True,
+) -> List[Dict]:
+    """
+    Analyse several (call_id, transcript) pairs concurrently. Results come
+    back in input order. `concurrency` bounds the number of transcripts in
+    flight at once to stay within API rate limits.
+    """
+    async with _analysis_session():
+        tasks = [
+            analyze_transcript_async(transcript, call_id=call_id, model=model, fused=fused)
+            for call_id, transcript in transcripts
+        ]
+        return await _gather_with_sem(tasks, sem=asyncio.Semaphore(concurrency))
+
+
+async def _analyze_batch_llm(
+    batch: List[Tuple[Optional[str], str, str]], model: str
+) -> List[Optional[Dict]]:
+    """
+    Analyse one packed group of (call_id, transcript, llm_transcript) items
+    with a single JSON-mode call. Items without a valid result are None.
+    Sections are numbered by position and results matched back by that
+    number, so repeated or missing call IDs cannot mix up results.
+    """
+    try:
+        sections = "\n".join(
+            prompts.BATCH_ITEM.format(index=index, transcript=llm_transcript)
+            for index, (_, _, llm_transcript) in enumerate(batch, 1)
+        )
+        resp = await _call_openai(
+            prompts.BATCH_PROMPT.format(transcripts=sections),
+            model=model,
+            response_format={"type": "json_object"},
+        )
+        by_index = {
+            str(item.get("item")): item
+            for item in orjson.loads(resp)["results"]
+            if isinstance(item, dict)
+        }
+    except Exception as e:
+        print(f"WARNING: Falling back to heuristics due to error: {e}")
+        return [None] * len(batch)
+
+    results = []
+    for index, (call_id, _, _) in enumerate(batch, 1):
+        item = by_index.get(str(index))
+        try:
+            analysis = CallAnalysis(
+                call_id=call_id,
+                summary=item["summary"],
+                classification=item["classification"],
+                improvements=item["improvements"],
+            )
+        except (TypeError, KeyError):
+            # Result missing, or not an object with all three keys
+            print(f"WARNING: No valid batch result for {call_id}, falling back to heuristics.")
+            results.append(None)
+            continue
+        results.append(analysis.to_dict())
+    return results
+
+
+async def _analyze_batch_cached(
+    batch: List[Tuple[Optional[str], str, str]], model: str
+) -> List[Optional[Dict]]:
+    """
+    `_analyze_batch_llm` behind the semantic cache: the whole group is
+    embedded in one request, and only items with no stored or in-flight
+    near-duplicate are sent to the LLM.
+    """
+    sem_cache = _semantic_cache_for(model, "batch")
+    try:
+        embeddings = await _embed([llm_transcript for _, _, llm_transcript in batch])
+    except Exception as e:
+        print(f"WARNING: Semantic cache unavailable, analysing without it: {e}")
+        return await _analyze_batch_llm(batch, model)
+
+    results: List[Optional[Dict]] = [None] * len(batch)
+    misses, waiting = [], []
+    for i, ((call_id, _, _), embedding) in enumerate(zip(batch, embeddings)):
+        entry = _peek(sem_cache, embedding)
+        if isinstance(entry, dict):
+            results[i] = _copy_result(entry, call_id)
+        elif entry is not None:
+            waiting.append(i)
+        else:
+            misses.append((i, _reserve(sem_cache, embedding)))
+
+    fresh: List[Optional[Dict]] = []
+    try:
+        if misses:
+            fresh = await _analyze_batch_llm([batch[i] for i, _ in misses], model)
+    finally:
+        fresh += [None] * (len(misses) - len(fresh))
+        for (i, index), result in zip(misses, fresh):
+            _settle(sem_cache, index, result)
+            results[i] = result
+
+    for i in waiting:
+        cached = await _semantic_lookup(sem_cache, embeddings[i])
+        if cached is not None:
+            results[i] = _copy_result(cached, batch[i][0])
+    return results
+
+
+async def _analyze_batch(batch: List[Tuple[Optional[str], str, str]], model: str) -> List[Dict]:
+    """Analyse one packed group, using heuristics for items the LLM missed."""
+    if semantic_cache.enabled():
+        results = await _analyze_batch_cached(batch, model)
+    else:
+        results = await _analyze_batch_llm(batch, model)
+    return [
+        result if result is not None else _heuristic_analysis(transcript, call_id=call_id)
+        for result, (call_id, transcript, _) in zip(results, batch)
+    ]
+
+
+async def analyze_transcripts_batch(
+    transcripts: List[Tuple[Optional[str], str]],
+    model: str = None,
+    token_budget: int = 6000,
+    concurrency: int = 16,
+) -> List[Dict]:
+    """
+    Analyse several (call_id, transcript) pairs by packing them into as few
+    fused requests as possible, up to `token_budget` transcript tokens each.
+    This amortises the per-request overhead and the shared prompt preamble
+    over many short calls. Results come back in input order.
+    `token_budget` only controls packing: a longer transcript gets a
+    request to itself and is truncated only if it overflows the model's
+    context window.
+    """
+    if model is None:
+        model = "gpt-4o-mini"
+
+    async with _analysis_session():
+        if _client() is None:
+            print("WARNING: No valid API key detected. Falling back to heuristics.")
+            return [_heuristic_analysis(t, call_id=call_id) for call_id, t in transcripts]
+
+        items, token_counts = [], []
+        for call_id, transcript in transcripts:
+            llm_transcript, n_tokens = _truncate_transcript(transcript, model)
+            items.append((call_id, transcript, llm_transcript))
+            token_counts.append(n_tokens)
+        batches = _pack_batches(items, token_counts, token_budget)
+        tasks = [_analyze_batch(batch, model) for batch in batches]
+        grouped = await _gather_with_sem(tasks, sem=asyncio.Semaphore(concurrency))
+        return [result for group in grouped for result in group]
@@ -4,36 +4,49 @@ run_example.py
 Run QA analysis on call transcripts.
 - Use `--call call3` to analyze a single call.
 - Use `--model gpt-4o` to pick a specific model.
+- Use `--stepwise` to run the three-call pipeline instead of one fused call.
 - Defaults to gpt-4o-mini if not specified.
 """
 
-import os
+import sys
+import asyncio
 import argparse
-from qa_agent import analyze_transcript
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from qa_agent import analyze_transcript, analyze_transcripts, analyze_transcripts_batch
 
-BASE_DIR = os.path.dirname(__file__)
-SAMPLE_DIR = os.path.join(BASE_DIR, "sample_transcripts")
+SAMPLE_DIR = Path(__file__).resolve().parent / "sample_transcripts"
+
+
+def _read_transcripts(directory: Path):
+    """Return (call_id, transcript) pairs for every .txt file, sorted by name."""
+    paths = sorted(p for p in directory.glob("*.txt") if p.is_file())
+    with ThreadPoolExecutor() as pool:
+        texts = pool.map(lambda p: p.read_text(encoding="utf-8"), paths)
+        return [(p.stem, text) for p, text in zip(paths, texts)]
 
 
 def print_report(result: dict, model: str):
-    """Pretty-print analysis results as a mini report."""
-    print("=" * 60)
-    print(f"Call ID: {result.get('call_id')}")
-    print(f"Model: {model}")
-    print("-" * 60)
-    print(f"Outcome: {result.get('classification')}")
-    print()
-    print("Summary:")
-    print(f"  {result.get('summary')}")
-    print()
-    print("Improvement Suggestions:")
+    """Pretty-print analysis results as a mini report in a single write."""
+    lines = [
+        "=" * 60,
+        f"Call ID: {result.get('call_id')}",
+        f"Model: {model}",
+        "-" * 60,
+        f"Outcome: {result.get('classification')}",
+        "",
+        "Summary:",
+        f"  {result.get('summary')}",
+        "",
+        "Improvement Suggestions:",
+    ]
     if isinstance(result.get("improvements"), list):
-        for i, suggestion in enumerate(result["improvements"], start=1):
-            print(f"  {i}. {suggestion}")
+        lines.extend(f"  {i}. {suggestion}"
+                     for i, suggestion in enumerate(result["improvements"], start=1))
     else:
-        print(f"  {result.get('improvements')}")
-    print("=" * 60)
-    print()
+        lines.append(f"  {result.get('improvements')}")
+    lines += ["=" * 60, "", ""]
+    sys.stdout.write("\n".join(lines))
 
 
 def main():
@@ -41,29 +54,31 @@ def main():
     parser.add_argument("--call", type=str, help="Which call to analyze (e.g., call1, call2, call3)")
     parser.add_argument("--model", type=str, default="gpt-4o-mini",
                         help="Which model to use (default: gpt-4o-mini). Examples: gpt-4o, gpt-4.5-preview")
+    parser.add_argument("--stepwise", action="store_true",
+                        help="Run summary, classification and improvements as three separate calls")
     args = parser.parse_args()
 
     model = args.model
     call_id = args.call
+    fused = not args.stepwise
 
     if call_id:
-        path = os.path.join(SAMPLE_DIR, f"{call_id}.txt")
-        if not os.path.exists(path):
+        path = SAMPLE_DIR / f"{call_id}.txt"
+        if not path.is_file():
             print(f"Transcript not found: {path}")
             return
-        with open(path, "r", encoding="utf-8") as f:
-            transcript = f.read()
-        result = analyze_transcript(transcript, call_id=call_id, model=model)
+        transcript = path.read_text(encoding="utf-8")
+        result = analyze_transcript(transcript, call_id=call_id, model=model, fused=fused)
         print_report(result, model)
     else:
         print(f"Analyzing all transcripts with {model}...\n")
-        for filename in sorted(os.listdir(SAMPLE_DIR)):
-            if filename.endswith(".txt"):
-                call_id = filename.replace(".txt", "")
-                with open(os.path.join(SAMPLE_DIR, filename), "r", encoding="utf-8") as f:
-                    transcript = f.read()
-                result = analyze_transcript(transcript, call_id=call_id, model=model)
-                print_report(result, model)
+        transcripts = _read_transcripts(SAMPLE_DIR)
+        if fused:
+            pending = analyze_transcripts_batch(transcripts, model=model)
+        else:
+            pending = analyze_transcripts(transcripts, model=model, fused=False)
+        for result in asyncio.run(pending):
+            print_report(result, model)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,127 @@
+"""
+semantic_cache.py
+Semantic cache for call analyses. Transcripts are embedded and compared by
+cosine similarity against earlier ones; a near-duplicate call reuses the
+stored analysis instead of running the LLM pipeline again. Entries are kept
+per model, pipeline and prompt version under `.qa_cache/` so they survive
+across runs without mixing results of different prompts.
+Enabled by setting `QA_SEMANTIC_CACHE=1`.
+"""
+
+import hashlib
+import os
+import re
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import orjson
+
+import cache
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIM = 1536
+SIMILARITY_THRESHOLD = 0.95
+
+
+def enabled() -> bool:
+    """Return True if semantic caching is switched on via QA_SEMANTIC_CACHE."""
+    return os.getenv("QA_SEMANTIC_CACHE") == "1"
+
+
+def path_for(model: str, pipeline: str, templates: Sequence[str]) -> Path:
+    """
+    Return the file holding the semantic cache for results of `model`
+    produced by `pipeline` from the prompt `templates`. Editing any of the
+    templates moves the cache to a new file.
+    """
+    safe_model = re.sub(r"[^\w.-]", "_", model)
+    digest = hashlib.sha256("\0".join(templates).encode()).hexdigest()[:16]
+    return cache.CACHE_DIR / f"semantic-{safe_model}-{pipeline}-{digest}.npz"
+
+
+class SemanticCache:
+    """
+    Unit-normalised embeddings are kept as rows of one preallocated matrix
+    that doubles in size when full, so a lookup is a single matrix-vector
+    product over all stored rows. Each row has a value: a finished analysis
+    dict, or any placeholder the caller stores while one is in progress.
+    Only dict values are saved to disk.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, threshold: float = SIMILARITY_THRESHOLD,
+                 capacity: int = 64):
+        self.threshold = threshold
+        self.dirty = False
+        self._embeddings = np.empty((capacity, dim), dtype=np.float32)
+        self._values: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @staticmethod
+    def _normalise(embedding: Sequence[float]) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        return vec / np.linalg.norm(vec)
+
+    def lookup(self, embedding: Sequence[float]) -> Optional[Any]:
+        """Return the value stored under the most similar row, if close enough."""
+        n = len(self._values)
+        if n == 0:
+            return None
+        sims = self._embeddings[:n] @ self._normalise(embedding)
+        best = int(np.argmax(sims))
+        if sims[best] >= self.threshold:
+            return self._values[best]
+        return None
+
+    def add(self, embedding: Sequence[float], value: Any) -> int:
+        """Store `value` under `embedding` and return its row index."""
+        n = len(self._values)
+        if n == len(self._embeddings):
+            grown = np.empty((2 * n, self._embeddings.shape[1]), dtype=np.float32)
+            grown[:n] = self._embeddings
+            self._embeddings = grown
+        self._embeddings[n] = self._normalise(embedding)
+        self._values.append(value)
+        self.dirty = True
+        return n
+
+    def update(self, index: int, value: Any) -> Any:
+        """Replace the value of row `index`, returning the previous one."""
+        previous, self._values[index] = self._values[index], value
+        self.dirty = True
+        return previous
+
+    def discard(self, index: int) -> Any:
+        """Make row `index` unmatchable, returning its previous value."""
+        self._embeddings[index] = 0
+        return self.update(index, None)
+
+    def save(self, path: Path) -> None:
+        """Write all finished entries to `path`."""
+        rows = [i for i, value in enumerate(self._values) if isinstance(value, dict)]
+        results = orjson.dumps([self._values[i] for i in rows])
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, embeddings=self._embeddings[rows],
+                     results=np.frombuffer(results, dtype=np.uint8))
+        os.replace(tmp_path, path)
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: Path) -> "SemanticCache":
+        """Return the cache saved at `path`, or an empty one if there is none."""
+        sem_cache = cls()
+        try:
+            with np.load(path) as data:
+                embeddings = data["embeddings"]
+                results: List[Dict] = orjson.loads(data["results"].tobytes())
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return sem_cache
+        for embedding, result in zip(embeddings, results):
+            sem_cache.add(embedding, result)
+        sem_cache.dirty = False
+        return sem_cache